@@ -1,44 +1,61 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from datetime import datetime, timezone
 
 from typing import Optional
 
 from app.db import RepositoryBundle
-from app.models import EventAnalytics
+from app.metrics import ANALYTICS_UPDATE_SECONDS
+from app.models import Event, EventAnalytics
 
 
 class AnalyticsAggregator:
     def __init__(self, repositories: RepositoryBundle) -> None:
         self.repositories = repositories
 
-    def update_event_analytics(self, event_id: str) -> Optional[EventAnalytics]:
+    @ANALYTICS_UPDATE_SECONDS.timed()
+    def update_event_analytics(self, event_id: str, refresh: bool = False) -> Optional[EventAnalytics]:
+        existing = self.repositories.analytics.get(event_id)
+        if existing is not None and existing.final and not refresh:
+            return existing
         event = self.repositories.events.get(event_id)
         if event is None:
             return None
-        end_time = event.end_time if event.status == "resolved" else datetime.now(tz=timezone.utc)
-        prices = list(
-            self.repositories.list_prices_in_window(
-                market_id=event.market_id,
-                start=event.start_time,
-                end=end_time,
-            )
+        final = event.status == "resolved"
+        end_time = event.end_time if final else datetime.now(tz=timezone.utc)
+        timestamps, prices = self.repositories.price_window(
+            market_id=event.market_id,
+            start=event.start_time,
+            end=end_time,
         )
+        resolution = event.resolution if final else None
         if not prices:
-            analytics = EventAnalytics(event_id=event.event_id)
-            self.repositories.analytics.upsert(analytics)
+            analytics = EventAnalytics(event_id=event.event_id, resolution=resolution, final=final)
+            self._store(event, analytics)
             return analytics
-        min_point = min(prices, key=lambda point: point.price)
-        max_point = max(prices, key=lambda point: point.price)
-        last_point = max(prices, key=lambda point: point.timestamp)
+        min_index = prices.index(min(prices))
+        max_index = prices.index(max(prices))
+        last_index = bisect_left(timestamps, timestamps[-1])
         analytics = EventAnalytics(
             event_id=event.event_id,
-            min_price=min_point.price,
-            min_price_time=min_point.timestamp,
-            max_price=max_point.price,
-            max_price_time=max_point.timestamp,
-            last_price=last_point.price,
-            last_price_time=last_point.timestamp,
+            min_price=prices[min_index],
+            min_price_ts=timestamps[min_index],
+            max_price=prices[max_index],
+            max_price_ts=timestamps[max_index],
+            last_price=prices[last_index],
+            last_price_ts=timestamps[last_index],
+            resolution=resolution,
+            final=final,
         )
-        self.repositories.analytics.upsert(analytics)
+        self._store(event, analytics)
         return analytics
+
+    def finalize_event_analytics(self, event_id: str) -> Optional[EventAnalytics]:
+        return self.update_event_analytics(event_id, refresh=True)
+
+    def _store(self, event: Event, analytics: EventAnalytics) -> None:
+        self.repositories.analytics.upsert(analytics)
+        self.repositories.analytics_table.upsert(event, analytics)
+        if analytics.final and analytics.last_price is not None:
+            self.repositories.prices.mark_compactable(event.market_id)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.db import ColumnarAnalyticsTable
+from app.models import to_epoch_us
+
+AGGREGATES = ("count", "mean", "min", "max")
+
+
+@dataclass(frozen=True)
+class AnalyticsQuery:
+    category: Optional[str] = None
+    status: Optional[str] = None
+    asset: Optional[str] = None
+    resolution: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    group_by: Tuple[str, ...] = ()
+    metric: str = "max_price"
+    aggregates: Tuple[str, ...] = ("count", "mean")
+
+    def validate(self) -> None:
+        if self.metric not in ColumnarAnalyticsTable.METRICS:
+            raise ValueError(f"Unknown metric: {self.metric}")
+        for dimension in self.group_by:
+            if dimension not in ColumnarAnalyticsTable.DIMENSIONS:
+                raise ValueError(f"Unknown group_by dimension: {dimension}")
+        for aggregate in self.aggregates:
+            if aggregate not in AGGREGATES and _percentile_rank(aggregate) is None:
+                raise ValueError(f"Unknown aggregate: {aggregate}")
+
+
+class AnalyticsQueryEngine:
+    def __init__(self, table: ColumnarAnalyticsTable) -> None:
+        self.table = table
+
+    def run(self, query: AnalyticsQuery) -> List[Dict[str, Any]]:
+        query.validate()
+        values = self.table.metrics[query.metric]
+        groups = self._group(self._filter(query), query.group_by)
+        results = []
+        for key in sorted(groups, key=lambda item: tuple((part is None, part) for part in item)):
+            selected = _gather(values, groups[key])
+            if not selected:
+                continue
+            row: Dict[str, Any] = dict(zip(query.group_by, key))
+            # count covers every matching event; the other aggregates skip events without prices
+            present = [value for value in selected if value == value]
+            row.update(self._aggregate(len(selected), present, query.aggregates))
+            results.append(row)
+        return results
+
+    def _filter(self, query: AnalyticsQuery) -> Optional[Set[int]]:
+        table = self.table
+        rows: Optional[Set[int]] = None
+        for name in ("category", "status", "asset", "resolution"):
+            expected = getattr(query, name)
+            if expected is not None:
+                posting = table.postings[name].get(expected, set())
+                rows = posting if rows is None else rows & posting
+        if query.since is not None or query.until is not None:
+            in_range = table.rows_between(
+                to_epoch_us(query.since) / 1_000_000 if query.since is not None else None,
+                to_epoch_us(query.until) / 1_000_000 if query.until is not None else None,
+            )
+            rows = in_range if rows is None else rows & in_range
+        return rows
+
+    def _group(
+        self,
+        rows: Optional[Set[int]],
+        group_by: Sequence[str],
+    ) -> Dict[Tuple[Any, ...], Optional[Set[int]]]:
+        groups: Dict[Tuple[Any, ...], Optional[Set[int]]] = {(): rows}
+        for dimension in group_by:
+            split: Dict[Tuple[Any, ...], Optional[Set[int]]] = {}
+            for key, indexes in groups.items():
+                for value, posting in list(self.table.postings[dimension].items()):
+                    matched = posting if indexes is None else indexes & posting
+                    if matched:
+                        split[key + (value,)] = matched
+            groups = split
+        return groups
+
+    @staticmethod
+    def _aggregate(count: int, values: List[float], aggregates: Sequence[str]) -> Dict[str, Optional[float]]:
+        result: Dict[str, Optional[float]] = {}
+        if any(_percentile_rank(aggregate) is not None for aggregate in aggregates):
+            values.sort()
+        for aggregate in aggregates:
+            if aggregate == "count":
+                result[aggregate] = count
+            elif not values:
+                result[aggregate] = None
+            elif aggregate == "mean":
+                result[aggregate] = math.fsum(values) / len(values)
+            elif aggregate == "min":
+                result[aggregate] = min(values)
+            elif aggregate == "max":
+                result[aggregate] = max(values)
+            else:
+                result[aggregate] = _percentile(values, _percentile_rank(aggregate))
+        return result
+
+
+def _gather(column: array, indexes: Optional[Set[int]]) -> List[float]:
+    if indexes is None:
+        return column.tolist()
+    if len(indexes) == 1:
+        return [column[next(iter(indexes))]]
+    return list(itemgetter(*indexes)(column)) if indexes else []
+
+
+def _percentile_rank(aggregate: str) -> Optional[float]:
+    if not aggregate.startswith("p"):
+        return None
+    try:
+        rank = float(aggregate[1:])
+    except ValueError:
+        return None
+    return rank if 0 <= rank <= 100 else None
+
+
+def _percentile(sorted_values: List[float], rank: float) -> float:
+    position = (len(sorted_values) - 1) * rank / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
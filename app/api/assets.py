@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes]
+    etag: str
+    media_type: str
+    cache_control: str = "public, max-age=300"
+
+    @classmethod
+    def load(cls, filename: str, media_type: str) -> StaticAsset:
+        with open(os.path.join(STATIC_DIR, filename), "rb") as handle:
+            body = handle.read()
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli_body=brotli.compress(body) if brotli is not None else None,
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            media_type=media_type,
+        )
+
+    def response(self, request: Request) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if self._not_modified(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        encodings = {
+            part.split(";")[0].strip().lower()
+            for part in request.headers.get("accept-encoding", "").split(",")
+        }
+        if "br" in encodings and self.brotli_body is not None:
+            headers["Content-Encoding"] = "br"
+            return Response(self.brotli_body, media_type=self.media_type, headers=headers)
+        if "gzip" in encodings:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+    def _not_modified(self, header: str) -> bool:
+        # If-None-Match uses weak comparison: W/"x" matches "x"
+        for tag in header.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
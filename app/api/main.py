@@ -1,28 +1,69 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+import contextlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import AsyncIterator
 
 from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
 from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 from starlette.routing import Route
 
-from app.analytics.aggregator import AnalyticsAggregator
-from app.clients.clob import ClobClient
-from app.clients.gamma import GammaClient
+from app.analytics.query import AnalyticsQuery
+from app.api.assets import StaticAsset
+from app.api.services import Services
 from app.config import settings
-from app.db import RepositoryBundle
-from app.ingestion.collector import EventCollector
-from app.models import Event, EventAnalytics, PricePoint
+from app.metrics import MetricsMiddleware, registry
+from app.models import Event, PricePoint
+from app.profiling import (
+    RequestProfilerMiddleware,
+    allocation_tracker,
+    is_admin,
+    request_profiles,
+    sample_stacks,
+)
+
+
+services = Services()
+
+registry.gauge("repository_events", "Stored events.", lambda: len(services.repositories.events))
+registry.gauge("repository_price_points", "Stored price points.", lambda: len(services.repositories.prices))
+registry.gauge("repository_analytics", "Stored analytics records.", lambda: len(services.repositories.analytics))
+registry.counter(
+    "price_ticks_ingested_total",
+    "Price points received by the price repository.",
+    callback=lambda: services.repositories.prices.ingested,
+)
+
+
+@lru_cache(maxsize=None)
+def dashboard_asset() -> StaticAsset:
+    return StaticAsset.load("dashboard.html", media_type="text/html")
+
 
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    dashboard_asset()
+    task = asyncio.create_task(services.series_tracker.run()) if settings.series_tracking else None
+    yield
+    if task is not None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    services.reset()
 
-app = Starlette(debug=False)
-repositories = RepositoryBundle()
-collector = EventCollector(repositories)
-aggregator = AnalyticsAggregator(repositories)
-clob_client = ClobClient()
-gamma_client = GammaClient()
+
+app = Starlette(
+    debug=False,
+    lifespan=lifespan,
+    middleware=[Middleware(MetricsMiddleware), Middleware(RequestProfilerMiddleware)],
+)
 
 
 async def ingest_events(request: Request) -> JSONResponse:
@@ -30,25 +71,78 @@ async def ingest_events(request: Request) -> JSONResponse:
     event_id = request.query_params.get("event_id")
     days_param = request.query_params.get("days")
     days = int(days_param) if days_param and days_param.isdigit() else None
-    events = collector.collect(category=category, days=days, event_id=event_id)
-    return JSONResponse([event.to_dict() for event in events])
+    run_id = request.query_params.get("run_id") or uuid.uuid4().hex
+    events = await run_in_threadpool(
+        services.collector.collect,
+        category=category,
+        days=days,
+        event_id=event_id,
+        run_id=run_id,
+    )
+    return JSONResponse([event.to_dict() for event in events], headers={"x-run-id": run_id})
+
+
+async def ingest_progress(request: Request) -> JSONResponse:
+    run_id = request.query_params.get("run_id")
+    if not run_id:
+        return JSONResponse([progress.to_dict() for progress in services.collector.recent_progress()])
+    progress = services.collector.progress(run_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return JSONResponse(progress.to_dict())
+
+
+async def ingest_backfill(request: Request) -> JSONResponse:
+    category = request.query_params.get("category")
+    event_id = request.query_params.get("event_id")
+    days_param = request.query_params.get("days")
+    days = int(days_param) if days_param and days_param.isdigit() else None
+    if request.query_params.get("collect") == "true":
+        await run_in_threadpool(
+            services.collector.collect,
+            category=category or settings.crypto_category,
+            days=days,
+            event_id=event_id,
+            include_closed=True,
+        )
+    if event_id:
+        event = services.repositories.events.get(event_id)
+        if event is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        events = [event]
+    elif category:
+        events = services.repositories.events.list_by_category(category)
+    else:
+        events = services.repositories.events.list_all()
+    result = await run_in_threadpool(services.backfiller.backfill, events, days=days)
+    return JSONResponse(result.to_dict())
+
+
+async def series_tick(request: Request) -> JSONResponse:
+    await run_in_threadpool(services.series_tracker.tick)
+    await run_in_threadpool(services.series_tracker.sample)
+    return JSONResponse(services.series_tracker.snapshot())
+
+
+async def list_series(request: Request) -> JSONResponse:
+    return JSONResponse(services.series_tracker.snapshot())
 
 
 async def ingest_price(request: Request) -> JSONResponse:
     event_id = request.path_params["event_id"]
-    event = repositories.events.get(event_id)
+    event = services.repositories.events.get(event_id)
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
     token_id = event.token_id
-    payload = clob_client.fetch_price(token_id)
+    payload = services.clob_client.fetch_price(token_id)
     price = float(payload.get("price", 0))
-    point = PricePoint(
+    point = PricePoint.at(
         market_id=event.market_id,
         token_id=token_id,
         timestamp=datetime.now(tz=timezone.utc),
         price=price,
     )
-    repositories.prices.add(point)
+    services.repositories.prices.add(point)
     return JSONResponse(point.to_dict())
 
 
@@ -56,22 +150,27 @@ async def sample_price(request: Request) -> JSONResponse:
     event_id = request.query_params.get("event_id")
     if not event_id:
         raise HTTPException(status_code=400, detail="event_id is required")
-    market = gamma_client.fetch_market_by_id(event_id)
+    market = services.gamma_client.fetch_market_by_id(event_id)
     if market is None:
         raise HTTPException(status_code=404, detail="Market not found for event_id")
     token_ids = market.get("clobTokenIds") or market.get("clob_token_ids") or []
     if not isinstance(token_ids, list) or not token_ids:
         raise HTTPException(status_code=404, detail="No clob token id available")
     token_id = str(token_ids[0])
-    payload = clob_client.fetch_price(token_id)
+    payload = services.clob_client.fetch_price(token_id)
     price = float(payload.get("price", 0))
-    point = PricePoint(
+    services.repositories.set_price_window(
+        str(market.get("id")),
+        services.collector._parse_datetime(market.get("startDate") or market.get("start_date")),
+        services.collector._parse_datetime(market.get("endDate") or market.get("end_date")),
+    )
+    point = PricePoint.at(
         market_id=str(market.get("id")),
         token_id=token_id,
         timestamp=datetime.now(tz=timezone.utc),
         price=price,
     )
-    repositories.prices.add(point)
+    services.repositories.prices.add(point)
     return JSONResponse(point.to_dict())
 
 
@@ -79,14 +178,25 @@ async def price_history(request: Request) -> JSONResponse:
     event_id = request.query_params.get("event_id")
     if not event_id:
         raise HTTPException(status_code=400, detail="event_id is required")
-    points = repositories.prices.list_for_market(event_id)
+    points = services.repositories.prices.list_for_market(event_id)
     payload = [point.to_dict() for point in points]
     return JSONResponse(payload)
 
 
+async def compression_stats(request: Request) -> JSONResponse:
+    return JSONResponse(services.repositories.prices.compression_stats())
+
+
+async def compact_prices(request: Request) -> JSONResponse:
+    _require_admin(request)
+    markets = services.repositories.prices.compactable()
+    removed = await run_in_threadpool(services.repositories.prices.compact)
+    return JSONResponse({"markets": markets, "removed": removed})
+
+
 async def list_events(request: Request) -> JSONResponse:
     category = request.query_params.get("category", settings.category_filter)
-    events = repositories.events.list_by_category(category)
+    events = services.repositories.events.list_by_category(category)
     return JSONResponse([event.to_dict() for event in events])
 
 
@@ -95,7 +205,12 @@ async def list_crypto_events(request: Request) -> JSONResponse:
     days = int(days_param) if days_param and days_param.isdigit() else None
     tag_param = request.query_params.get("tag_id")
     tag_id = tag_param.strip() if tag_param else None
-    events = collector.collect(category=settings.crypto_category, days=days, tag_id=tag_id)
+    events = await run_in_threadpool(
+        services.collector.collect,
+        category=settings.crypto_category,
+        days=days,
+        tag_id=tag_id,
+    )
     payload = [
         {
             "event_id": event.event_id,
@@ -109,7 +224,7 @@ async def list_crypto_events(request: Request) -> JSONResponse:
 
 
 async def list_tags(request: Request) -> JSONResponse:
-    tags = collector.list_tags()
+    tags = services.collector.list_tags()
     filtered = []
     for tag in tags:
         slug = tag.get("slug")
@@ -129,7 +244,7 @@ async def list_events_by_tag(request: Request) -> JSONResponse:
     tag_id = request.query_params.get("tag_id")
     if not tag_id:
         raise HTTPException(status_code=400, detail="tag_id is required")
-    events = gamma_client.fetch_markets_by_tag(tag_id)
+    events = services.gamma_client.fetch_markets_by_tag(tag_id)
     payload = [
         {
             "id": event.get("id"),
@@ -150,18 +265,34 @@ async def get_event_history(request: Request) -> JSONResponse:
     days = int(days_param) if days_param.isdigit() else None
     if not days:
         raise HTTPException(status_code=400, detail="days must be numeric")
-    market = gamma_client.fetch_market_by_id(event_id)
+    market = services.gamma_client.fetch_market_by_id(event_id)
     if market is None:
         raise HTTPException(status_code=404, detail="Market not found for event_id")
-    start_time = collector._parse_datetime(market.get("startDate") or market.get("start_date"))
-    end_time = collector._parse_datetime(market.get("endDate") or market.get("end_date"))
-    outcome_prices = market.get("outcomePrices") or market.get("outcome_prices") or []
+    start_time = services.collector._parse_datetime(market.get("startDate") or market.get("start_date"))
+    end_time = services.collector._parse_datetime(market.get("endDate") or market.get("end_date"))
+    market_id = str(market.get("id"))
+    token_ids = market.get("clobTokenIds") or market.get("clob_token_ids") or []
     prices = []
-    for price in outcome_prices:
-        try:
-            prices.append(float(price))
-        except (TypeError, ValueError):
-            continue
+    backfill_failed = False
+    if isinstance(token_ids, list) and token_ids:
+        window_start = start_time or datetime.now(tz=timezone.utc) - timedelta(days=days)
+        services.repositories.set_price_window(market_id, window_start, end_time)
+        backfill = await run_in_threadpool(
+            services.backfiller.backfill,
+            [
+                Event(
+                    event_id=market_id,
+                    market_id=market_id,
+                    token_id=str(token_ids[0]),
+                    title=str(market.get("question") or market.get("title") or ""),
+                    category=str(market.get("category") or ""),
+                    start_time=window_start,
+                    end_time=end_time,
+                )
+            ],
+        )
+        backfill_failed = bool(backfill.failed)
+        prices = services.repositories.price_window(market_id, window_start, end_time)[1].tolist()
     status = "closed" if market.get("closed") else "active"
     if market.get("resolved"):
         status = "resolved"
@@ -175,6 +306,8 @@ async def get_event_history(request: Request) -> JSONResponse:
             "status": status,
             "max_probability": max(prices) if prices else None,
             "min_probability": min(prices) if prices else None,
+            "price_points": len(prices),
+            "backfill_failed": backfill_failed,
             "total_volume": volume,
         }
     ]
@@ -183,7 +316,7 @@ async def get_event_history(request: Request) -> JSONResponse:
 
 async def get_event(request: Request) -> JSONResponse:
     event_id = request.path_params["event_id"]
-    event = repositories.events.get(event_id)
+    event = services.repositories.events.get(event_id)
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
     return JSONResponse(event.to_dict())
@@ -191,312 +324,125 @@ async def get_event(request: Request) -> JSONResponse:
 
 async def get_event_analytics(request: Request) -> JSONResponse:
     event_id = request.path_params["event_id"]
-    analytics = repositories.analytics.get(event_id)
-    if analytics is None:
-        analytics = aggregator.update_event_analytics(event_id)
+    analytics = services.repositories.analytics.get(event_id)
+    if analytics is None or not analytics.final:
+        analytics = services.aggregator.update_event_analytics(event_id)
     if analytics is None:
         raise HTTPException(status_code=404, detail="Event not found")
     return JSONResponse(analytics.to_dict())
 
 
-def _render_homepage() -> str:
-    return """<!doctype html>
-<html lang="en">
-  <head>
-    <meta charset="utf-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1" />
-    <title>Polymarket Crypto/15M Analytics</title>
-    <style>
-      :root {
-        color-scheme: light;
-        font-family: "Inter", "Segoe UI", sans-serif;
-        background: #f6f8fa;
-        color: #1f2328;
-      }
-      body { margin: 0; padding: 2rem; }
-      h1 { margin-bottom: 0.25rem; }
-      h2 { margin-top: 2rem; }
-      .card { background: #ffffff; border: 1px solid #d0d7de; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem; }
-      .grid { display: grid; gap: 1rem; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr)); }
-      button { background: #0969da; color: #fff; border: none; border-radius: 6px; padding: 0.5rem 0.9rem; cursor: pointer; }
-      button.secondary { background: #6e7781; }
-      button:disabled { background: #94a3b8; cursor: not-allowed; }
-      table { width: 100%; border-collapse: collapse; }
-      th, td { padding: 0.5rem; border-bottom: 1px solid #eaeef2; text-align: left; font-size: 0.95rem; }
-      code { background: #f6f8fa; padding: 0.1rem 0.25rem; border-radius: 4px; }
-      .status { font-weight: 600; }
-      .note { color: #57606a; }
-      .error { color: #b42318; }
-      .muted { color: #6e7781; }
-      .pill { background: #eef2ff; color: #4338ca; padding: 0.1rem 0.5rem; border-radius: 999px; font-size: 0.75rem; }
-    </style>
-  </head>
-  <body>
-    <h1>Polymarket Crypto/15M Analytics</h1>
-    <p class="note">Use this dashboard to fetch events, select one, and compute analytics.</p>
-
-    <div class="card">
-      <h2>1) Select tag, event & period</h2>
-      <div class="grid">
-        <div>
-          <label class="muted" for="tag-select">Tag</label>
-          <select id="tag-select" style="width:100%; padding:0.4rem; border-radius:6px; border:1px solid #d0d7de;"></select>
-        </div>
-        <div>
-          <label class="muted" for="event-select">Event</label>
-          <select id="event-select" style="width:100%; padding:0.4rem; border-radius:6px; border:1px solid #d0d7de;"></select>
-        </div>
-        <div>
-          <label class="muted" for="period-select">Period</label>
-          <select id="period-select" style="width:100%; padding:0.4rem; border-radius:6px; border:1px solid #d0d7de;">
-            <option value="1">1 day</option>
-            <option value="7" selected>7 days</option>
-            <option value="14">14 days</option>
-            <option value="30">30 days</option>
-          </select>
-        </div>
-      </div>
-      <p class="note">Choose a crypto event and period, then fetch data.</p>
-      <div class="grid">
-        <button id="load-tags">Load tags</button>
-        <button id="load-events">Load events</button>
-        <button id="fetch-history" class="secondary">Fetch history</button>
-      </div>
-      <span id="ingest-status" class="note"></span>
-    </div>
-
-    <div class="card">
-      <h2>2) Event history</h2>
-      <div id="event-error" class="error"></div>
-      <table id="events-table">
-        <thead>
-          <tr>
-            <th>Title</th>
-            <th>Status</th>
-            <th>Start</th>
-            <th>End</th>
-            <th>Min prob</th>
-            <th>Max prob</th>
-            <th>Volume</th>
-          </tr>
-        </thead>
-        <tbody></tbody>
-      </table>
-    </div>
-
-    <div class="card">
-      <h2>3) Probability over time</h2>
-      <div class="grid">
-        <button id="start-tracking">Start tracking price</button>
-        <button id="stop-tracking" class="secondary">Stop tracking</button>
-      </div>
-      <canvas id="price-chart" height="120"></canvas>
-      <p class="note">The chart uses sampled prices collected while tracking is running.</p>
-    </div>
-
-    <script>
-      const state = { events: [], selected: null };
-
-      const elements = {
-        fetchBtn: document.getElementById("fetch-history"),
-        loadBtn: document.getElementById("load-events"),
-        loadTagsBtn: document.getElementById("load-tags"),
-        eventSelect: document.getElementById("event-select"),
-        tagSelect: document.getElementById("tag-select"),
-        periodSelect: document.getElementById("period-select"),
-        ingestStatus: document.getElementById("ingest-status"),
-        eventsTable: document.querySelector("#events-table tbody"),
-        eventError: document.getElementById("event-error"),
-        startTracking: document.getElementById("start-tracking"),
-        stopTracking: document.getElementById("stop-tracking"),
-        chartCanvas: document.getElementById("price-chart"),
-      };
-
-      let priceChart = null;
-      let trackingInterval = null;
-
-      function renderHistory(events) {
-        elements.eventsTable.innerHTML = "";
-        events.forEach((event) => {
-          const row = document.createElement("tr");
-          row.innerHTML = `
-            <td>${event.title || "-"}</td>
-            <td><span class="pill">${event.status}</span></td>
-            <td>${event.start_time || "-"}</td>
-            <td>${event.end_time || "-"}</td>
-            <td>${event.min_probability ?? "-"}</td>
-            <td>${event.max_probability ?? "-"}</td>
-            <td>${event.total_volume ?? "-"}</td>
-          `;
-          elements.eventsTable.appendChild(row);
-        });
-      }
-
-      async function loadCryptoEvents() {
-        const tagId = elements.tagSelect.value;
-        elements.ingestStatus.textContent = "Loading options...";
-        const response = await fetch(`/options/events?tag_id=${tagId}`);
-        if (!response.ok) {
-          elements.ingestStatus.textContent = "Failed to load options.";
-          return;
-        }
-        const options = await response.json();
-        elements.eventSelect.innerHTML = "";
-        options.forEach((event) => {
-          const option = document.createElement("option");
-          option.value = event.id;
-          option.textContent = event.title || event.id;
-          elements.eventSelect.appendChild(option);
-        });
-        if (options.length === 0) {
-          elements.ingestStatus.textContent = "No events found for this tag.";
-          return;
-        }
-        elements.eventSelect.value = options[0].id;
-        elements.ingestStatus.textContent = `Loaded ${options.length} events.`;
-      }
-
-      async function fetchHistory() {
-        elements.eventError.textContent = "";
-        const tagId = elements.tagSelect.value;
-        const eventId = elements.eventSelect.value;
-        const days = elements.periodSelect.value;
-        if (!tagId || !eventId) {
-          elements.eventError.textContent = "Select a tag and event first.";
-          return;
-        }
-        const response = await fetch(`/events/history?tag_id=${tagId}&event_id=${eventId}&days=${days}`);
-        if (!response.ok) {
-          let detail = "Failed to load history.";
-          try {
-            const payload = await response.json();
-            if (payload && payload.detail) {
-              detail = payload.detail;
-            }
-          } catch (error) {
-            // ignore parse errors
-          }
-          elements.eventError.textContent = detail;
-          return;
-        }
-        const events = await response.json();
-        renderHistory(events);
-        await loadPriceHistory();
-      }
-
-      async function loadPriceHistory() {
-        const eventId = elements.eventSelect.value;
-        if (!eventId) {
-          return;
-        }
-        const response = await fetch(`/events/price-history?event_id=${eventId}`);
-        if (!response.ok) {
-          return;
-        }
-        const points = await response.json();
-        const labels = points.map((point) => point.timestamp);
-        const data = points.map((point) => point.price);
-        renderChart(labels, data);
-      }
-
-      async function samplePrice() {
-        const eventId = elements.eventSelect.value;
-        if (!eventId) {
-          elements.eventError.textContent = "Select an event first.";
-          return;
-        }
-        await fetch(`/events/price-sample?event_id=${eventId}`, { method: "POST" });
-        await loadPriceHistory();
-      }
+def _split_param(value: str | None) -> tuple:
+    if not value:
+        return ()
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+async def query_analytics(request: Request) -> JSONResponse:
+    params = request.query_params
+    if "tag" in params:
+        raise HTTPException(status_code=400, detail="tag is not a query dimension; filter by asset instead")
+    query = AnalyticsQuery(
+        category=params.get("category"),
+        status=params.get("status"),
+        asset=params.get("asset"),
+        resolution=params.get("resolution"),
+        since=services.collector._parse_datetime(params.get("since")),
+        until=services.collector._parse_datetime(params.get("until")),
+        group_by=_split_param(params.get("group_by")),
+        metric=params.get("metric", "max_price"),
+        aggregates=_split_param(params.get("aggregates")) or ("count", "mean"),
+    )
+    try:
+        rows = services.query_engine.run(query)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return JSONResponse(rows)
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def _require_admin(request: Request) -> None:
+    if not is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+async def profile_process(request: Request) -> PlainTextResponse:
+    _require_admin(request)
+    try:
+        seconds = float(request.query_params.get("seconds", "5"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="seconds must be numeric")
+    if not 0 < seconds <= settings.profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {settings.profile_max_seconds}]")
+    stacks = await run_in_threadpool(sample_stacks, seconds)
+    return PlainTextResponse(stacks)
+
+
+async def list_request_profiles(request: Request) -> JSONResponse:
+    _require_admin(request)
+    return JSONResponse(request_profiles.ids())
+
+
+async def get_request_profile(request: Request) -> PlainTextResponse:
+    _require_admin(request)
+    report = request_profiles.get(request.path_params["profile_id"])
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(report)
+
+
+async def start_tracemalloc(request: Request) -> JSONResponse:
+    _require_admin(request)
+    frames_param = request.query_params.get("frames")
+    frames = int(frames_param) if frames_param and frames_param.isdigit() else 10
+    allocation_tracker.start(frames)
+    return JSONResponse({"tracing": True, "frames": frames})
+
+
+async def tracemalloc_snapshot(request: Request) -> JSONResponse:
+    _require_admin(request)
+    limit_param = request.query_params.get("limit")
+    limit = int(limit_param) if limit_param and limit_param.isdigit() else 20
+    try:
+        snapshot = allocation_tracker.snapshot(limit)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return JSONResponse(snapshot)
 
-      function renderChart(labels, data) {
-        if (!window.Chart) {
-          return;
-        }
-        if (priceChart) {
-          priceChart.destroy();
-        }
-        const ctx = elements.chartCanvas.getContext("2d");
-        priceChart = new Chart(ctx, {
-          type: "line",
-          data: {
-            labels,
-            datasets: [
-              {
-                label: "Probability",
-                data,
-                borderColor: "#0969da",
-                backgroundColor: "rgba(9, 105, 218, 0.1)",
-                tension: 0.2,
-              },
-            ],
-          },
-          options: {
-            scales: {
-              y: {
-                min: 0,
-                max: 1,
-              },
-            },
-          },
-        });
-      }
-
-      async function loadTags() {
-        elements.ingestStatus.textContent = "Loading tags...";
-        const response = await fetch("/options/tags");
-        if (!response.ok) {
-          elements.ingestStatus.textContent = "Failed to load tags.";
-          return;
-        }
-        const tags = await response.json();
-        elements.tagSelect.innerHTML = "";
-        tags.forEach((tag) => {
-          const option = document.createElement("option");
-          option.value = tag.id;
-          option.textContent = tag.slug || tag.id;
-          elements.tagSelect.appendChild(option);
-        });
-        elements.ingestStatus.textContent = `Loaded ${tags.length} tags.`;
-      }
-
-      elements.fetchBtn.addEventListener("click", fetchHistory);
-      elements.loadTagsBtn.addEventListener("click", loadTags);
-      elements.loadBtn.addEventListener("click", loadCryptoEvents);
-      elements.tagSelect.addEventListener("change", () => {
-        loadCryptoEvents();
-      });
-      elements.startTracking.addEventListener("click", () => {
-        if (trackingInterval) {
-          return;
-        }
-        samplePrice();
-        trackingInterval = setInterval(samplePrice, 30000);
-      });
-      elements.stopTracking.addEventListener("click", () => {
-        if (trackingInterval) {
-          clearInterval(trackingInterval);
-          trackingInterval = null;
-        }
-      });
 
-      loadTags();
-    </script>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"></script>
-  </body>
-</html>
-"""
+async def stop_tracemalloc(request: Request) -> JSONResponse:
+    _require_admin(request)
+    allocation_tracker.stop()
+    return JSONResponse({"tracing": False})
 
 
-async def homepage(request: Request) -> HTMLResponse:
-    return HTMLResponse(_render_homepage())
+async def homepage(request: Request) -> Response:
+    return dashboard_asset().response(request)
 
 
 app.routes.extend(
     [
         Route("/", homepage, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+        Route("/admin/profile", profile_process, methods=["POST"]),
+        Route("/admin/profile/requests", list_request_profiles, methods=["GET"]),
+        Route("/admin/profile/requests/{profile_id}", get_request_profile, methods=["GET"]),
+        Route("/admin/tracemalloc/start", start_tracemalloc, methods=["POST"]),
+        Route("/admin/tracemalloc/snapshot", tracemalloc_snapshot, methods=["GET"]),
+        Route("/admin/tracemalloc/stop", stop_tracemalloc, methods=["POST"]),
         Route("/ingest/events", ingest_events, methods=["POST"]),
+        Route("/ingest/progress", ingest_progress, methods=["GET"]),
+        Route("/ingest/backfill", ingest_backfill, methods=["POST"]),
         Route("/ingest/price/{event_id}", ingest_price, methods=["POST"]),
+        Route("/ingest/compression", compression_stats, methods=["GET"]),
+        Route("/ingest/compact", compact_prices, methods=["POST"]),
+        Route("/series/tick", series_tick, methods=["POST"]),
+        Route("/series", list_series, methods=["GET"]),
         Route("/events", list_events, methods=["GET"]),
         Route("/options/crypto-events", list_crypto_events, methods=["GET"]),
         Route("/options/events", list_events_by_tag, methods=["GET"]),
@@ -504,6 +450,7 @@ app.routes.extend(
         Route("/events/history", get_event_history, methods=["GET"]),
         Route("/events/price-sample", sample_price, methods=["POST"]),
         Route("/events/price-history", price_history, methods=["GET"]),
+        Route("/analytics/query", query_analytics, methods=["GET"]),
         Route("/events/{event_id}", get_event, methods=["GET"]),
         Route("/events/{event_id}/analytics", get_event_analytics, methods=["GET"]),
     ]
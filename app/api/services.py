@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+from app.analytics.aggregator import AnalyticsAggregator
+from app.analytics.query import AnalyticsQueryEngine
+from app.db import RepositoryBundle
+
+if TYPE_CHECKING:
+    from app.clients.clob import ClobClient
+    from app.clients.gamma import GammaClient
+    from app.ingestion.backfill import HistoryBackfiller
+    from app.ingestion.collector import EventCollector
+    from app.ingestion.series import MarketSeriesTracker
+
+
+class Services:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+
+    def provide(self, name: str, instance: Any) -> None:
+        self._instances[name] = instance
+
+    def reset(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def _get(self, name: str, factory: Callable[[Services], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._instances[name] = factory(self)
+        return instance
+
+    @property
+    def repositories(self) -> RepositoryBundle:
+        return self._get("repositories", lambda services: RepositoryBundle())
+
+    @property
+    def aggregator(self) -> AnalyticsAggregator:
+        return self._get("aggregator", lambda services: AnalyticsAggregator(services.repositories))
+
+    @property
+    def query_engine(self) -> AnalyticsQueryEngine:
+        return self._get("query_engine", lambda services: AnalyticsQueryEngine(services.repositories.analytics_table))
+
+    @property
+    def clob_client(self) -> ClobClient:
+        return self._get("clob_client", _build_clob_client)
+
+    @property
+    def gamma_client(self) -> GammaClient:
+        return self._get("gamma_client", _build_gamma_client)
+
+    @property
+    def collector(self) -> EventCollector:
+        return self._get("collector", _build_collector)
+
+    @property
+    def backfiller(self) -> HistoryBackfiller:
+        return self._get("backfiller", _build_backfiller)
+
+    @property
+    def series_tracker(self) -> MarketSeriesTracker:
+        return self._get("series_tracker", _build_series_tracker)
+
+
+# The builders import lazily so that `requests` and the ingestion stack are
+# only loaded once a route needs them, keeping cold start short.
+
+
+def _build_clob_client(services: Services) -> ClobClient:
+    from app.clients.clob import ClobClient
+
+    return ClobClient()
+
+
+def _build_gamma_client(services: Services) -> GammaClient:
+    from app.clients.gamma import GammaClient
+
+    return GammaClient()
+
+
+def _build_collector(services: Services) -> EventCollector:
+    from app.ingestion.collector import EventCollector
+
+    return EventCollector(services.repositories, gamma=services.gamma_client, aggregator=services.aggregator)
+
+
+def _build_backfiller(services: Services) -> HistoryBackfiller:
+    from app.ingestion.backfill import HistoryBackfiller
+
+    return HistoryBackfiller(services.repositories, aggregator=services.aggregator, clob=services.clob_client)
+
+
+def _build_series_tracker(services: Services) -> MarketSeriesTracker:
+    from app.ingestion.series import MarketSeriesTracker
+
+    return MarketSeriesTracker(
+        services.repositories,
+        services.collector,
+        services.aggregator,
+        clob=services.clob_client,
+    )
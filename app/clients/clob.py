@@ -1,16 +1,41 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
 
 from app.config import settings
+from app.metrics import UPSTREAM_ERRORS, UPSTREAM_REQUEST_SECONDS
 
 
 class ClobClient:
     def __init__(self, base_url: Optional[str] = None) -> None:
         self.base_url = base_url or settings.clob_base_url
 
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        with UPSTREAM_REQUEST_SECONDS.time("clob", path):
+            try:
+                response = requests.get(f"{self.base_url}{path}", params=params, timeout=30)
+                response.raise_for_status()
+            except requests.RequestException:
+                UPSTREAM_ERRORS.inc(1, "clob", path)
+                raise
+            return response.json()
+
     def fetch_price(self, token_id: str, side: str = "buy") -> Dict[str, Any]:
-        url = f"{self.base_url}/price"
-        response = requests.get(url, params={"token_id": token_id, "side": side}, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        return self._get("/price", params={"token_id": token_id, "side": side})
+
+    def fetch_prices_history(
+        self,
+        token_id: str,
+        start_ts: int,
+        end_ts: int,
+        fidelity: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"market": token_id, "startTs": start_ts, "endTs": end_ts}
+        if fidelity:
+            params["fidelity"] = fidelity
+        payload = self._get("/prices-history", params=params)
+        if isinstance(payload, dict):
+            return payload.get("history", [])
+        if isinstance(payload, list):
+            return payload
+        return []
@@ -3,17 +3,25 @@ from typing import Any, Dict, Iterable, List, Optional
 import requests
 
 from app.config import settings
+from app.metrics import UPSTREAM_ERRORS, UPSTREAM_REQUEST_SECONDS
 
 
 class GammaClient:
     def __init__(self, base_url: Optional[str] = None) -> None:
         self.base_url = base_url or settings.gamma_base_url
 
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        with UPSTREAM_REQUEST_SECONDS.time("gamma", path):
+            try:
+                response = requests.get(f"{self.base_url}{path}", params=params, timeout=30)
+                response.raise_for_status()
+            except requests.RequestException:
+                UPSTREAM_ERRORS.inc(1, "gamma", path)
+                raise
+            return response.json()
+
     def fetch_markets(self, params: Optional[Dict[str, Any]] = None) -> Iterable[Dict[str, Any]]:
-        url = f"{self.base_url}/markets"
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        payload = response.json()
+        payload = self._get("/markets", params=params)
         if isinstance(payload, list):
             return payload
         if isinstance(payload, dict):
@@ -21,17 +29,10 @@ class GammaClient:
         return []
 
     def fetch_tags(self, limit: int = 100) -> List[Dict[str, Any]]:
-        url = f"{self.base_url}/tags"
         all_tags: List[Dict[str, Any]] = []
         offset = 0
         while True:
-            response = requests.get(
-                url,
-                params={"limit": limit, "offset": offset},
-                timeout=30,
-            )
-            response.raise_for_status()
-            payload = response.json()
+            payload = self._get("/tags", params={"limit": limit, "offset": offset})
             if isinstance(payload, list):
                 batch = payload
             elif isinstance(payload, dict):
@@ -47,10 +48,7 @@ class GammaClient:
         return all_tags
 
     def fetch_events(self, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        url = f"{self.base_url}/events"
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        payload = response.json()
+        payload = self._get("/events", params=params)
         if isinstance(payload, list):
             return payload
         if isinstance(payload, dict):
@@ -69,3 +67,9 @@ class GammaClient:
             if str(market.get("id")) == str(market_id):
                 return market
         return None
+
+    def fetch_market_by_slug(self, slug: str) -> Optional[Dict[str, Any]]:
+        for market in self.fetch_markets(params={"slug": slug}):
+            if market.get("slug") == slug:
+                return market
+        return None
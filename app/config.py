@@ -1,4 +1,13 @@
+import os
 from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
 @dataclass(frozen=True)
@@ -7,6 +16,25 @@ class Settings:
     clob_base_url: str = "https://clob.polymarket.com"
     category_filter: str = "crypto/15M"
     crypto_category: str = "crypto"
+    compress_ticks: bool = _env_flag("ANALYTICS_COMPRESS_TICKS", False)
+    # markets normalized between progress updates; normalization itself runs serially
+    collector_progress_batch_size: int = 500
+    metrics_enabled: bool = _env_flag("ANALYTICS_METRICS_ENABLED", True)
+    admin_token: Optional[str] = os.environ.get("ANALYTICS_ADMIN_TOKEN")
+    profile_max_seconds: float = 60.0
+    profile_top_functions: int = 50
+    series_assets: Tuple[str, ...] = ("btc", "eth", "sol", "xrp")
+    series_slug_template: str = "{asset}-updown-15m-{start}"
+    series_interval_seconds: int = 900
+    series_prefetch_seconds: int = 120
+    series_poll_seconds: float = 5.0
+    series_tracking: bool = _env_flag("ANALYTICS_SERIES_TRACKING", False)
+    series_resolution_grace_seconds: int = 3600
+    backfill_workers: int = 8
+    backfill_requests_per_second: float = 10.0
+    backfill_fidelity_minutes: int = 1
+    backfill_chunk_seconds: int = 86400
+    backfill_checkpoint_path: Optional[str] = os.environ.get("ANALYTICS_BACKFILL_CHECKPOINTS")
 
 
 settings = Settings()
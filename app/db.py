@@ -1,41 +1,242 @@
 from __future__ import annotations
 
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from datetime import datetime, timezone
+from itertools import repeat
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from app.models import Event, EventAnalytics, PricePoint
+from app.config import settings
+from app.models import Event, EventAnalytics, PricePoint, to_epoch_us
+
+EventWindow = Tuple[Optional[int], Optional[int]]
 
 
 class InMemoryEventRepository:
     def __init__(self) -> None:
         self._events: Dict[str, Event] = {}
+        self._by_market: Dict[str, Event] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
 
     def upsert(self, event: Event) -> None:
         self._events[event.event_id] = event
+        self._by_market[event.market_id] = event
+
+    def upsert_many(self, events: Iterable[Event]) -> None:
+        for event in events:
+            self._events[event.event_id] = event
+            self._by_market[event.market_id] = event
 
     def get(self, event_id: str) -> Optional[Event]:
         return self._events.get(event_id)
 
+    def get_by_market(self, market_id: str) -> Optional[Event]:
+        return self._by_market.get(market_id)
+
     def list_by_category(self, category: str) -> List[Event]:
-        return [event for event in self._events.values() if event.category == category]
+        return [event for event in list(self._events.values()) if event.category == category]
+
+    def list_all(self) -> List[Event]:
+        return list(self._events.values())
+
+
+class PriceSeries:
+    __slots__ = ("token_id", "ts", "prices", "received")
+
+    def __init__(self, token_id: str) -> None:
+        self.token_id = token_id
+        self.ts = array("q")
+        self.prices = array("d")
+        self.received = 0
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def bounds(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        lower = bisect_left(self.ts, start) if start is not None else 0
+        upper = bisect_right(self.ts, end) if end is not None else len(self.ts)
+        return lower, upper
 
 
 class InMemoryPriceRepository:
-    def __init__(self) -> None:
-        self._prices: Dict[str, List[PricePoint]] = defaultdict(list)
+    def __init__(
+        self,
+        compress: bool = False,
+        window_lookup: Optional[Callable[[str], Optional[EventWindow]]] = None,
+    ) -> None:
+        self._series: Dict[str, PriceSeries] = {}
+        self.compress = compress
+        self._window_lookup = window_lookup
+        self._windows: Dict[str, EventWindow] = {}
+        self._compactable: Set[str] = set()
+        self._compacted = 0
+        self._compacted_received = 0
+        # add/add_many/compact run on the event loop and in threadpool workers (backfill, collector)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(series) for series in list(self._series.values()))
+
+    def __contains__(self, market_id: str) -> bool:
+        return market_id in self._series
+
+    @property
+    def ingested(self) -> int:
+        return sum(series.received for series in list(self._series.values())) + self._compacted_received
 
     def add(self, price_point: PricePoint) -> None:
-        self._prices[price_point.market_id].append(price_point)
+        with self._lock:
+            self._add(price_point)
+
+    def _add(self, price_point: PricePoint) -> None:
+        series = self._series.get(price_point.market_id)
+        if series is None:
+            series = self._series_for(price_point)
+        series.received += 1
+        if self._compactable:
+            # ticks arriving after finalization are not covered by the final analytics
+            self._compactable.discard(price_point.market_id)
+        ts, price = price_point.ts, price_point.price
+        if series.ts and ts < series.ts[-1]:
+            index = bisect_right(series.ts, ts)
+            series.ts.insert(index, ts)
+            series.prices.insert(index, price)
+            return
+        if self.compress and self._extends_run(price_point.market_id, series, ts, price):
+            series.ts[-1] = ts
+            return
+        series.ts.append(ts)
+        series.prices.append(price)
+
+    def add_many(self, price_points: Iterable[PricePoint]) -> int:
+        pending: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        count = 0
+        tokens: Dict[str, str] = {}
+        for price_point in price_points:
+            tokens.setdefault(price_point.market_id, price_point.token_id)
+            pending[price_point.market_id].append((price_point.ts, price_point.price))
+            count += 1
+        for samples in pending.values():
+            samples.sort()
+        with self._lock:
+            for market_id, samples in pending.items():
+                self._merge(market_id, tokens[market_id], samples)
+        return count
+
+    def _merge(self, market_id: str, token_id: str, samples: List[Tuple[int, float]]) -> None:
+        series = self._series.get(market_id)
+        if series is None:
+            series = PriceSeries(token_id)
+        merged = PriceSeries(series.token_id)
+        merged.received = series.received + len(samples)
+        samples.extend(zip(series.ts, series.prices))
+        samples.sort()
+        for ts, price in samples:
+            if merged.ts and merged.ts[-1] == ts and merged.prices[-1] == price:
+                continue
+            if self.compress and self._extends_run(market_id, merged, ts, price):
+                merged.ts[-1] = ts
+                continue
+            merged.ts.append(ts)
+            merged.prices.append(price)
+        self._series[market_id] = merged
+        self._compactable.discard(market_id)
+
+    def set_window(self, market_id: str, window: EventWindow) -> None:
+        self._windows[market_id] = window
+
+    def mark_compactable(self, market_id: str) -> None:
+        with self._lock:
+            self._compactable.add(market_id)
+
+    def compactable(self) -> List[str]:
+        return sorted(self._compactable)
+
+    def compact(self) -> int:
+        removed = 0
+        with self._lock:
+            for market_id in list(self._compactable):
+                series = self._series.pop(market_id, None)
+                if series is not None:
+                    removed += len(series)
+                    self._compacted_received += series.received
+            self._compactable.clear()
+            self._compacted += removed
+        return removed
+
+    def compression_stats(self) -> Dict[str, float]:
+        series_list = list(self._series.values())
+        stored = sum(len(series) for series in series_list)
+        received = sum(series.received for series in series_list)
+        return {
+            "received": received,
+            "stored": stored,
+            "ratio": received / stored if stored else 1.0,
+            "compacted": self._compacted,
+        }
+
+    def _series_for(self, price_point: PricePoint) -> PriceSeries:
+        series = self._series.get(price_point.market_id)
+        if series is None:
+            series = self._series[price_point.market_id] = PriceSeries(price_point.token_id)
+        return series
+
+    def _extends_run(self, market_id: str, series: PriceSeries, ts: int, price: float) -> bool:
+        # A run of equal prices is kept as its first and last tick; a run never
+        # spans the event start/end so window-clipped analytics stay exact.
+        # Until a market's window is known its ticks are stored as received.
+        if len(series) < 2:
+            return False
+        if not series.prices[-2] == series.prices[-1] == price:
+            return False
+        window = self._window(market_id)
+        if window is None:
+            return False
+        return self._segment(series.ts[-2], window) == self._segment(ts, window)
+
+    def _window(self, market_id: str) -> Optional[EventWindow]:
+        window = self._window_lookup(market_id) if self._window_lookup else None
+        return window if window is not None else self._windows.get(market_id)
+
+    @staticmethod
+    def _segment(ts: int, window: EventWindow) -> int:
+        start, end = window
+        if start is not None and ts < start:
+            return 0
+        if end is not None and ts > end:
+            return 2
+        return 1
+
+    def window(self, market_id: str, start: Optional[int], end: Optional[int]) -> Tuple[array, array]:
+        series = self._series.get(market_id)
+        if series is None:
+            return array("q"), array("d")
+        lower, upper = series.bounds(start, end)
+        return series.ts[lower:upper], series.prices[lower:upper]
+
+    def token_for(self, market_id: str) -> str:
+        series = self._series.get(market_id)
+        return series.token_id if series is not None else ""
 
     def list_for_market(self, market_id: str) -> List[PricePoint]:
-        return list(self._prices.get(market_id, []))
+        series = self._series.get(market_id)
+        if series is None:
+            return []
+        return list(map(PricePoint, repeat(market_id), repeat(series.token_id), series.ts, series.prices))
 
 
 class InMemoryAnalyticsRepository:
     def __init__(self) -> None:
         self._analytics: Dict[str, EventAnalytics] = {}
 
+    def __len__(self) -> int:
+        return len(self._analytics)
+
     def upsert(self, analytics: EventAnalytics) -> None:
         self._analytics[analytics.event_id] = analytics
 
@@ -43,11 +244,125 @@ class InMemoryAnalyticsRepository:
         return self._analytics.get(event_id)
 
 
+class ColumnarAnalyticsTable:
+    METRICS = ("min_price", "max_price", "last_price", "losing_max_price")
+    DIMENSIONS = ("category", "status", "asset", "resolution", "hour")
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self.event_id: List[str] = []
+        self.category: List[str] = []
+        self.status: List[str] = []
+        self.asset: List[Optional[str]] = []
+        self.resolution: List[Optional[str]] = []
+        self.hour: List[Optional[int]] = []
+        self.start_ts = array("d")
+        self.metrics: Dict[str, array] = {metric: array("d") for metric in self.METRICS}
+        # value -> row indexes per dimension, and (start_ts, row) sorted for range filters
+        self.postings: Dict[str, Dict[object, Set[int]]] = {name: {} for name in self.DIMENSIONS}
+        self._by_start: List[Tuple[float, int]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.event_id)
+
+    def upsert(self, event: Event, analytics: EventAnalytics) -> None:
+        # collector runs and backfills finalize analytics from threadpool workers
+        with self._lock:
+            self._upsert(event, analytics)
+
+    def _upsert(self, event: Event, analytics: EventAnalytics) -> None:
+        start_time = _as_utc(event.start_time) if event.start_time else None
+        row = {
+            "category": event.category,
+            "status": event.status,
+            "asset": event.asset,
+            "resolution": analytics.resolution,
+            "hour": start_time.hour if start_time else None,
+        }
+        values = {
+            "min_price": analytics.min_price,
+            "max_price": analytics.max_price,
+            "last_price": analytics.last_price,
+            "losing_max_price": self._losing_max_price(analytics),
+        }
+        start_ts = to_epoch_us(start_time) / 1_000_000 if start_time else math.nan
+        index = self._index.get(event.event_id)
+        if index is None:
+            index = self._index[event.event_id] = len(self.event_id)
+            self.event_id.append(event.event_id)
+            for name, value in row.items():
+                getattr(self, name).append(value)
+                self.postings[name].setdefault(value, set()).add(index)
+            self.start_ts.append(start_ts)
+            if not math.isnan(start_ts):
+                insort(self._by_start, (start_ts, index))
+            for metric, value in values.items():
+                self.metrics[metric].append(math.nan if value is None else value)
+            return
+        for name, value in row.items():
+            column = getattr(self, name)
+            previous = column[index]
+            if previous != value:
+                self._unpost(name, previous, index)
+                self.postings[name].setdefault(value, set()).add(index)
+            column[index] = value
+        previous_ts = self.start_ts[index]
+        if not (previous_ts == start_ts or math.isnan(previous_ts) and math.isnan(start_ts)):
+            if not math.isnan(previous_ts):
+                del self._by_start[bisect_left(self._by_start, (previous_ts, index))]
+            if not math.isnan(start_ts):
+                insort(self._by_start, (start_ts, index))
+        self.start_ts[index] = start_ts
+        for metric, value in values.items():
+            self.metrics[metric][index] = math.nan if value is None else value
+
+    def rows_between(self, since: Optional[float], until: Optional[float]) -> Set[int]:
+        lower = bisect_left(self._by_start, (since,)) if since is not None else 0
+        upper = bisect_left(self._by_start, (until,)) if until is not None else len(self._by_start)
+        return {index for _, index in self._by_start[lower:upper]}
+
+    def _unpost(self, name: str, value: object, index: int) -> None:
+        posting = self.postings[name][value]
+        posting.discard(index)
+        if not posting:
+            del self.postings[name][value]
+
+    @staticmethod
+    def _losing_max_price(analytics: EventAnalytics) -> Optional[float]:
+        if analytics.resolution is None or analytics.max_price is None or analytics.min_price is None:
+            return None
+        if analytics.resolution.strip().lower() in ("yes", "up", "1", "true"):
+            return 1.0 - analytics.min_price
+        return analytics.max_price
+
+
 class RepositoryBundle:
     def __init__(self) -> None:
         self.events = InMemoryEventRepository()
-        self.prices = InMemoryPriceRepository()
+        self.prices = InMemoryPriceRepository(
+            compress=settings.compress_ticks,
+            window_lookup=self._event_window,
+        )
         self.analytics = InMemoryAnalyticsRepository()
+        self.analytics_table = ColumnarAnalyticsTable()
+
+    def _event_window(self, market_id: str) -> Optional[EventWindow]:
+        event = self.events.get_by_market(market_id)
+        if event is None:
+            return None
+        return _epoch_or_none(event.start_time), _epoch_or_none(event.end_time)
+
+    def set_price_window(self, market_id: str, start: Optional[datetime], end: Optional[datetime]) -> None:
+        self.prices.set_window(market_id, (_epoch_or_none(start), _epoch_or_none(end)))
+
+    def price_window(
+        self,
+        market_id: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> Tuple[array, array]:
+        return self.prices.window(market_id, _epoch_or_none(start), _epoch_or_none(end))
 
     def list_prices_in_window(
         self,
@@ -55,9 +370,15 @@ class RepositoryBundle:
         start: Optional[datetime],
         end: Optional[datetime],
     ) -> Iterable[PricePoint]:
-        for price_point in self.prices.list_for_market(market_id):
-            if start and price_point.timestamp < start:
-                continue
-            if end and price_point.timestamp > end:
-                continue
-            yield price_point
+        timestamps, prices = self.price_window(market_id, start, end)
+        token_id = self.prices.token_for(market_id)
+        return map(PricePoint, repeat(market_id), repeat(token_id), timestamps, prices)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # naive datetimes are UTC throughout, as in to_epoch_us
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _epoch_or_none(value: Optional[datetime]) -> Optional[int]:
+    return to_epoch_us(value) if value is not None else None
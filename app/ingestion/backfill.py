@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from app.analytics.aggregator import AnalyticsAggregator
+from app.clients.clob import ClobClient
+from app.config import settings
+from app.db import RepositoryBundle
+from app.models import Event, PricePoint
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second: float) -> None:
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BackfillCheckpoints:
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._checkpoints: Dict[str, Tuple[int, int]] = self._load()
+
+    def get(self, market_id: str) -> Optional[Tuple[int, int]]:
+        return self._checkpoints.get(market_id)
+
+    def cover(self, market_id: str, start_ts: int, end_ts: int) -> None:
+        with self._lock:
+            covered = self._checkpoints.get(market_id)
+            if covered is not None:
+                start_ts, end_ts = min(start_ts, covered[0]), max(end_ts, covered[1])
+            self._checkpoints[market_id] = (start_ts, end_ts)
+            self._save()
+
+    def _load(self) -> Dict[str, Tuple[int, int]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        return {str(market_id): (int(start), int(end)) for market_id, (start, end) in payload.items()}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self._checkpoints, handle)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class BackfillResult:
+    events: int = 0
+    points: int = 0
+    skipped: int = 0
+    failed: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "events": self.events,
+            "points": self.points,
+            "skipped": self.skipped,
+            "failed": list(self.failed),
+        }
+
+
+class HistoryBackfiller:
+    def __init__(
+        self,
+        repositories: RepositoryBundle,
+        aggregator: Optional[AnalyticsAggregator] = None,
+        clob: Optional[ClobClient] = None,
+        checkpoints: Optional[BackfillCheckpoints] = None,
+        workers: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+    ) -> None:
+        self.repositories = repositories
+        self.aggregator = aggregator or AnalyticsAggregator(repositories)
+        self.clob = clob or ClobClient()
+        self.checkpoints = checkpoints or BackfillCheckpoints(settings.backfill_checkpoint_path)
+        self.workers = workers or settings.backfill_workers
+        if requests_per_second is None:
+            requests_per_second = settings.backfill_requests_per_second
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+    def backfill(self, events: Iterable[Event], days: Optional[int] = None) -> BackfillResult:
+        now = datetime.now(tz=timezone.utc)
+        result = BackfillResult()
+        jobs: List[Tuple[Event, int, int, List[Tuple[int, int]]]] = []
+        for event in events:
+            window = self._window(event, now, days)
+            gaps = self._gaps(event.market_id, *window) if window is not None else []
+            if not gaps:
+                result.skipped += 1
+                continue
+            jobs.append((event, window[0], window[1], gaps))
+        if not jobs:
+            return result
+        loaded: List[Event] = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self._fetch_series, event, gaps): (event, start_ts, end_ts)
+                for event, start_ts, end_ts, gaps in jobs
+            }
+            for future in as_completed(futures):
+                event, start_ts, end_ts = futures[future]
+                try:
+                    points = future.result()
+                except (requests.RequestException, AttributeError, KeyError, TypeError, ValueError):
+                    result.failed.append(event.event_id)
+                    continue
+                result.points += self.repositories.prices.add_many(points)
+                self.checkpoints.cover(event.market_id, start_ts, end_ts)
+                result.events += 1
+                loaded.append(event)
+        for event in loaded:
+            self.aggregator.update_event_analytics(event.event_id, refresh=True)
+        return result
+
+    def _window(self, event: Event, now: datetime, days: Optional[int]) -> Optional[Tuple[int, int]]:
+        end_time = min(event.end_time, now) if event.end_time else now
+        start_time = event.start_time
+        if start_time is None and days:
+            start_time = now - timedelta(days=days)
+        if start_time is None:
+            return None
+        start_ts = int(start_time.timestamp())
+        end_ts = int(end_time.timestamp())
+        if start_ts >= end_ts:
+            return None
+        return start_ts, end_ts
+
+    def _gaps(self, market_id: str, start_ts: int, end_ts: int) -> List[Tuple[int, int]]:
+        covered = self.checkpoints.get(market_id)
+        # checkpoints can outlive the in-memory store (a persisted file after a
+        # restart); they only count while the store still holds that market
+        if covered is None or market_id not in self.repositories.prices:
+            return [(start_ts, end_ts)]
+        gaps = []
+        if start_ts < covered[0]:
+            gaps.append((start_ts, min(end_ts, covered[0])))
+        if end_ts > covered[1]:
+            gaps.append((max(start_ts, covered[1]), end_ts))
+        return gaps
+
+    def _fetch_series(self, event: Event, gaps: List[Tuple[int, int]]) -> List[PricePoint]:
+        points: List[PricePoint] = []
+        for start_ts, end_ts in gaps:
+            points.extend(self._fetch_range(event, start_ts, end_ts))
+        return points
+
+    def _fetch_range(self, event: Event, start_ts: int, end_ts: int) -> List[PricePoint]:
+        points: List[PricePoint] = []
+        chunk_start = start_ts
+        while chunk_start < end_ts:
+            chunk_end = min(chunk_start + settings.backfill_chunk_seconds, end_ts)
+            self.rate_limiter.acquire()
+            history = self.clob.fetch_prices_history(
+                event.token_id,
+                start_ts=chunk_start,
+                end_ts=chunk_end,
+                fidelity=settings.backfill_fidelity_minutes,
+            )
+            for sample in history:
+                points.append(
+                    PricePoint(
+                        market_id=event.market_id,
+                        token_id=event.token_id,
+                        ts=int(sample["t"]) * 1_000_000,
+                        price=float(sample["p"]),
+                    )
+                )
+            chunk_start = chunk_end
+        return points
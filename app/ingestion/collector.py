@@ -1,50 +1,142 @@
 from __future__ import annotations
 
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Optional
 
+from app.analytics.aggregator import AnalyticsAggregator
 from app.clients.gamma import GammaClient
 from app.config import settings
 from app.db import RepositoryBundle
+from app.metrics import COLLECT_SECONDS, COLLECTED_EVENTS
 from app.models import Event
 
 
+@lru_cache(maxsize=65536)
+def _parse_iso(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _normalize(value: str) -> str:
+    return value.strip().lower().replace(" ", "")
+
+
+@dataclass
+class CollectProgress:
+    run_id: str
+    total: int = 0
+    processed: int = 0
+    collected: int = 0
+    done: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "total": self.total,
+            "processed": self.processed,
+            "collected": self.collected,
+            "done": self.done,
+        }
+
+
 class EventCollector:
-    def __init__(self, repositories: RepositoryBundle, gamma: Optional[GammaClient] = None) -> None:
+    def __init__(
+        self,
+        repositories: RepositoryBundle,
+        gamma: Optional[GammaClient] = None,
+        aggregator: Optional[AnalyticsAggregator] = None,
+    ) -> None:
         self.repositories = repositories
         self.gamma = gamma or GammaClient()
+        self.aggregator = aggregator
         self._tag_cache: Dict[str, Optional[str]] = {}
+        self.progress_limit = 20
+        self._runs: "OrderedDict[str, CollectProgress]" = OrderedDict()
+        self._runs_lock = threading.Lock()
 
+    @COLLECT_SECONDS.timed()
     def collect(
         self,
         category: Optional[str] = None,
         days: Optional[int] = None,
         event_id: Optional[str] = None,
         tag_id: Optional[str] = None,
+        include_closed: bool = False,
+        run_id: Optional[str] = None,
     ) -> List[Event]:
+        progress = self._start_run(run_id or uuid.uuid4().hex)
         category_filter = category or settings.category_filter
-        markets = self._fetch_markets(category_filter, tag_id=tag_id)
+        markets = list(self._fetch_markets(category_filter, tag_id=tag_id, include_closed=include_closed))
+        progress.total = len(markets)
         collected: List[Event] = []
         cutoff = self._cutoff_datetime(days)
-        for market in markets:
-            event = self._to_event(market, category_filter)
-            if event is None:
-                continue
-            if event_id and event.event_id != event_id:
-                continue
-            if cutoff and not self._is_recent(event, cutoff):
-                continue
-            self.repositories.events.upsert(event)
-            collected.append(event)
+        batch_size = settings.collector_progress_batch_size
+        for offset in range(0, len(markets), batch_size):
+            for market in markets[offset:offset + batch_size]:
+                event = self._to_event(market, category_filter)
+                if event is None:
+                    continue
+                if event_id and event.event_id != event_id:
+                    continue
+                if cutoff and not self._is_recent(event, cutoff):
+                    continue
+                collected.append(event)
+            progress.processed = min(offset + batch_size, len(markets))
+            progress.collected = len(collected)
+        if self.aggregator is None:
+            self.repositories.events.upsert_many(collected)
+        else:
+            previous = {event.event_id: self.repositories.events.get(event.event_id) for event in collected}
+            self.repositories.events.upsert_many(collected)
+            for event in collected:
+                if self._became_resolved(previous[event.event_id], event):
+                    self.aggregator.finalize_event_analytics(event.event_id)
+        progress.done = True
+        COLLECTED_EVENTS.inc(len(collected))
         return collected
 
-    def _fetch_markets(self, category_filter: str, tag_id: Optional[str] = None) -> Iterable[Dict[str, Any]]:
+    def progress(self, run_id: str) -> Optional[CollectProgress]:
+        return self._runs.get(run_id)
+
+    def recent_progress(self) -> List[CollectProgress]:
+        with self._runs_lock:
+            return list(reversed(self._runs.values()))
+
+    def _start_run(self, run_id: str) -> CollectProgress:
+        progress = CollectProgress(run_id=run_id)
+        with self._runs_lock:
+            self._runs.pop(run_id, None)
+            self._runs[run_id] = progress
+            while len(self._runs) > self.progress_limit:
+                self._runs.popitem(last=False)
+        return progress
+
+    def _became_resolved(self, previous: Optional[Event], event: Event) -> bool:
+        if self.aggregator is None or event.status != "resolved":
+            return False
+        return previous is None or previous.status != "resolved"
+
+    def _fetch_markets(
+        self,
+        category_filter: str,
+        tag_id: Optional[str] = None,
+        include_closed: bool = False,
+    ) -> Iterable[Dict[str, Any]]:
         if category_filter == settings.crypto_category:
             resolved_tag_id = tag_id or self._get_tag_id(settings.crypto_category)
             if resolved_tag_id is not None:
-                events = self.gamma.fetch_events(
-                    params={"tag_id": resolved_tag_id, "active": "true", "closed": "false"}
-                )
+                params: Dict[str, Any] = {"tag_id": resolved_tag_id}
+                if not include_closed:
+                    params.update({"active": "true", "closed": "false"})
+                events = self.gamma.fetch_events(params=params)
                 if events:
                     return events
             return self.gamma.fetch_markets(params={"category": category_filter})
@@ -71,6 +163,7 @@ class EventCollector:
             end_time=self._parse_datetime(market.get("end_date")),
             resolution=market.get("resolution"),
             status="resolved" if market.get("resolved") else "active",
+            slug=market.get("slug"),
         )
 
     @staticmethod
@@ -79,10 +172,7 @@ class EventCollector:
             return None
         if isinstance(value, datetime):
             return value
-        try:
-            return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
-        except ValueError:
-            return None
+        return _parse_iso(str(value))
 
     @staticmethod
     def _cutoff_datetime(days: Optional[int]) -> Optional[datetime]:
@@ -100,7 +190,7 @@ class EventCollector:
 
     @staticmethod
     def _normalize_category(value: str) -> str:
-        return value.strip().lower().replace(" ", "")
+        return _normalize(value)
 
     def _matches_category(self, category: str, category_filter: str) -> bool:
         normalized = self._normalize_category(category)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from starlette.concurrency import run_in_threadpool
+
+from app.analytics.aggregator import AnalyticsAggregator
+from app.clients.clob import ClobClient
+from app.clients.gamma import GammaClient
+from app.config import settings
+from app.db import RepositoryBundle
+from app.ingestion.collector import EventCollector
+from app.models import Event, EventAnalytics, PricePoint
+
+
+@dataclass
+class SeriesAggregate:
+    asset: str
+    windows: int = 0
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    last_price_sum: float = 0.0
+    last_price_count: int = 0
+    resolutions: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, analytics: EventAnalytics) -> None:
+        self.windows += 1
+        if analytics.min_price is not None:
+            self.min_price = min(analytics.min_price, self.min_price if self.min_price is not None else 1.0)
+        if analytics.max_price is not None:
+            self.max_price = max(analytics.max_price, self.max_price if self.max_price is not None else 0.0)
+        if analytics.last_price is not None:
+            self.last_price_sum += analytics.last_price
+            self.last_price_count += 1
+
+    def add_resolution(self, resolution: str) -> None:
+        self.resolutions[resolution] = self.resolutions.get(resolution, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {
+            "asset": self.asset,
+            "windows": self.windows,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "mean_last_price": (self.last_price_sum / self.last_price_count) if self.last_price_count else None,
+            "resolutions": dict(self.resolutions),
+        }
+
+
+@dataclass
+class SeriesState:
+    current: Optional[Event] = None
+    next: Optional[Event] = None
+
+
+class MarketSeriesTracker:
+    def __init__(
+        self,
+        repositories: RepositoryBundle,
+        collector: EventCollector,
+        aggregator: AnalyticsAggregator,
+        gamma: Optional[GammaClient] = None,
+        clob: Optional[ClobClient] = None,
+        assets: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.repositories = repositories
+        self.collector = collector
+        self.aggregator = aggregator
+        self.gamma = gamma or collector.gamma
+        self.clob = clob or ClobClient()
+        self.assets = list(assets or settings.series_assets)
+        self.interval = timedelta(seconds=settings.series_interval_seconds)
+        self.prefetch = timedelta(seconds=settings.series_prefetch_seconds)
+        self.subscriptions: Dict[str, Event] = {}
+        self.aggregates: Dict[str, SeriesAggregate] = {asset: SeriesAggregate(asset) for asset in self.assets}
+        self._series: Dict[str, SeriesState] = {asset: SeriesState() for asset in self.assets}
+        self._finalized: set = set()
+        self._unresolved: Dict[str, Tuple[str, Event]] = {}
+        self._lock = threading.Lock()
+
+    def tick(self, now: Optional[datetime] = None) -> None:
+        now = now or datetime.now(tz=timezone.utc)
+        with self._lock:
+            self._tick(now)
+            self._resolve(now)
+
+    def _tick(self, now: datetime) -> None:
+        window_start = self._window_start(now)
+        next_start = window_start + self.interval
+        for asset in self.assets:
+            state = self._series[asset]
+            if state.current is not None and state.current.end_time <= now:
+                self._finalize(asset, state.current)
+                state.current = None
+            if state.next is not None and state.next.end_time <= now:
+                self._finalize(asset, state.next)
+                state.next = None
+            if state.current is None:
+                if state.next is not None and state.next.start_time <= now:
+                    state.current, state.next = state.next, None
+                else:
+                    state.current = self._load(asset, window_start)
+            if state.next is None and next_start - now <= self.prefetch:
+                state.next = self._load(asset, next_start)
+
+    def sample(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(tz=timezone.utc)
+        with self._lock:
+            return self._sample(now)
+
+    def _sample(self, now: datetime) -> int:
+        sampled = 0
+        for token_id, event in list(self.subscriptions.items()):
+            if not event.start_time <= now <= event.end_time:
+                continue
+            try:
+                payload = self.clob.fetch_price(token_id)
+            except requests.RequestException:
+                continue
+            self.repositories.prices.add(
+                PricePoint.at(
+                    market_id=event.market_id,
+                    token_id=token_id,
+                    timestamp=now,
+                    price=float(payload.get("price", 0)),
+                )
+            )
+            sampled += 1
+        return sampled
+
+    def seconds_until_deadline(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(tz=timezone.utc)
+        next_start = self._window_start(now) + self.interval
+        deadlines = [next_start, next_start - self.prefetch]
+        return max(min((deadline - now).total_seconds() for deadline in deadlines if deadline > now), 0.0)
+
+    async def run(self) -> None:
+        while True:
+            await run_in_threadpool(self.tick)
+            await run_in_threadpool(self.sample)
+            await asyncio.sleep(min(settings.series_poll_seconds, self.seconds_until_deadline()))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        payload = []
+        for asset in self.assets:
+            state = self._series[asset]
+            payload.append(
+                {
+                    "asset": asset,
+                    "current": state.current.to_dict() if state.current else None,
+                    "next": state.next.to_dict() if state.next else None,
+                    "aggregate": self.aggregates[asset].to_dict(),
+                }
+            )
+        return payload
+
+    def _window_start(self, now: datetime) -> datetime:
+        seconds = int(self.interval.total_seconds())
+        return datetime.fromtimestamp(int(now.timestamp()) // seconds * seconds, tz=timezone.utc)
+
+    def _load(self, asset: str, start_time: datetime) -> Optional[Event]:
+        slug = settings.series_slug_template.format(asset=asset, start=int(start_time.timestamp()))
+        try:
+            market = self.gamma.fetch_market_by_slug(slug)
+        except requests.RequestException:
+            return None
+        event = self._to_event(market, slug, start_time)
+        if event is None:
+            return None
+        self.repositories.events.upsert(event)
+        self.subscriptions[event.token_id] = event
+        return event
+
+    def _finalize(self, asset: str, event: Event) -> None:
+        self.subscriptions.pop(event.token_id, None)
+        if event.event_id in self._finalized:
+            return
+        analytics = self.aggregator.update_event_analytics(event.event_id)
+        if analytics is None:
+            return
+        self._finalized.add(event.event_id)
+        self.aggregates[asset].add(analytics)
+        self._unresolved[event.event_id] = (asset, event)
+
+    def _resolve(self, now: datetime) -> None:
+        # Gamma only reports the outcome some time after the window closes, so
+        # finished windows are re-fetched on each tick until they resolve.
+        grace = timedelta(seconds=settings.series_resolution_grace_seconds)
+        for event_id, (asset, event) in list(self._unresolved.items()):
+            try:
+                market = self.gamma.fetch_market_by_slug(event.slug) if event.slug else None
+            except requests.RequestException:
+                market = None
+            resolved = self._to_event(market, event.slug, event.start_time)
+            if resolved is not None and resolved.status == "resolved":
+                self.repositories.events.upsert(resolved)
+                self.aggregator.finalize_event_analytics(event_id)
+                if resolved.resolution:
+                    self.aggregates[asset].add_resolution(resolved.resolution)
+            elif now - event.end_time < grace:
+                continue
+            del self._unresolved[event_id]
+
+    def _to_event(
+        self,
+        market: Optional[Dict[str, Any]],
+        slug: Optional[str],
+        start_time: datetime,
+    ) -> Optional[Event]:
+        if market is None:
+            return None
+        event = self.collector._to_event(market, settings.crypto_category)
+        if event is None:
+            return None
+        return replace(event, slug=slug, start_time=start_time, end_time=start_time + self.interval)
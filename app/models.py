@@ -1,13 +1,39 @@
-from dataclasses import asdict, dataclass, field
-from datetime import datetime
-from typing import Optional
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+_SERIES_SLUG = re.compile(r"^(?P<asset>[a-z0-9]+)-updown-15m-(?P<start>\d+)$")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
 
 
 def _serialize_datetime(value: Optional[datetime]) -> Optional[str]:
     return value.isoformat() if value else None
 
 
-@dataclass
+def _serialize_epoch(value: Optional[int]) -> Optional[str]:
+    return from_epoch_us(value).isoformat() if value is not None else None
+
+
+def parse_series_slug(slug: Optional[str]) -> Optional[Tuple[str, int]]:
+    match = _SERIES_SLUG.match(slug or "")
+    if match is None:
+        return None
+    return match.group("asset"), int(match.group("start"))
+
+
+@dataclass(slots=True)
 class Event:
     event_id: str
     market_id: str
@@ -17,41 +43,74 @@ class Event:
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     resolution: Optional[str] = None
-    status: str = field(default="active")
+    status: str = "active"
+    slug: Optional[str] = None
+
+    @property
+    def asset(self) -> Optional[str]:
+        parsed = parse_series_slug(self.slug)
+        return parsed[0] if parsed else None
 
     def to_dict(self) -> dict:
-        payload = asdict(self)
-        payload["start_time"] = _serialize_datetime(self.start_time)
-        payload["end_time"] = _serialize_datetime(self.end_time)
-        return payload
+        return {
+            "event_id": self.event_id,
+            "market_id": self.market_id,
+            "token_id": self.token_id,
+            "title": self.title,
+            "category": self.category,
+            "start_time": _serialize_datetime(self.start_time),
+            "end_time": _serialize_datetime(self.end_time),
+            "resolution": self.resolution,
+            "status": self.status,
+            "slug": self.slug,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class PricePoint:
     market_id: str
     token_id: str
-    timestamp: datetime
+    ts: int
     price: float
 
+    @classmethod
+    def at(cls, market_id: str, token_id: str, timestamp: datetime, price: float) -> "PricePoint":
+        return cls(market_id, token_id, to_epoch_us(timestamp), price)
+
+    @property
+    def timestamp(self) -> datetime:
+        return from_epoch_us(self.ts)
+
     def to_dict(self) -> dict:
-        payload = asdict(self)
-        payload["timestamp"] = _serialize_datetime(self.timestamp)
-        return payload
+        return {
+            "market_id": self.market_id,
+            "token_id": self.token_id,
+            "timestamp": _serialize_epoch(self.ts),
+            "price": self.price,
+        }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EventAnalytics:
     event_id: str
     min_price: Optional[float] = None
-    min_price_time: Optional[datetime] = None
+    min_price_ts: Optional[int] = None
     max_price: Optional[float] = None
-    max_price_time: Optional[datetime] = None
+    max_price_ts: Optional[int] = None
     last_price: Optional[float] = None
-    last_price_time: Optional[datetime] = None
+    last_price_ts: Optional[int] = None
+    resolution: Optional[str] = None
+    final: bool = False
 
     def to_dict(self) -> dict:
-        payload = asdict(self)
-        payload["min_price_time"] = _serialize_datetime(self.min_price_time)
-        payload["max_price_time"] = _serialize_datetime(self.max_price_time)
-        payload["last_price_time"] = _serialize_datetime(self.last_price_time)
-        return payload
+        return {
+            "event_id": self.event_id,
+            "min_price": self.min_price,
+            "min_price_time": _serialize_epoch(self.min_price_ts),
+            "max_price": self.max_price,
+            "max_price_time": _serialize_epoch(self.max_price_ts),
+            "last_price": self.last_price,
+            "last_price_time": _serialize_epoch(self.last_price_ts),
+            "resolution": self.resolution,
+            "final": self.final,
+        }
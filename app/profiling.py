@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_HEADER = b"x-admin-token"
+
+
+def is_admin(token: Optional[str]) -> bool:
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token, settings.admin_token)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_stacks(duration: float, interval: float = 0.005, stop: Optional[threading.Event] = None) -> str:
+    own_thread = threading.get_ident()
+    counts: Counter = Counter()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline and not (stop is not None and stop.is_set()):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class RequestProfiles:
+    def __init__(self, limit: int = 20) -> None:
+        self.limit = limit
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile_id: str, report: str) -> None:
+        with self._lock:
+            self._profiles[profile_id] = report
+            while len(self._profiles) > self.limit:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        return self._profiles.get(profile_id)
+
+    def ids(self) -> List[str]:
+        return list(self._profiles)
+
+
+request_profiles = RequestProfiles()
+
+
+class RequestProfilerMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._active = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers", []))
+        if PROFILE_HEADER not in headers or not is_admin(headers.get(ADMIN_HEADER, b"").decode()):
+            await self.app(scope, receive, send)
+            return
+        # cProfile hooks the interpreter globally, so only one request is profiled at a time.
+        if not self._active.acquire(blocking=False):
+            await PlainTextResponse("Another request is being profiled", status_code=409)(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._active.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            await PlainTextResponse("Another profiler is active", status_code=409)(scope, receive, send)
+            return
+        # cProfile only sees the event loop thread; handlers that hand work to the
+        # threadpool (ingestion, backfill) show up in the sampled stacks instead.
+        stop = threading.Event()
+        sampler = asyncio.ensure_future(run_in_threadpool(sample_stacks, settings.profile_max_seconds, stop=stop))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            stop.set()
+            stacks = await sampler
+            output = io.StringIO()
+            stats = pstats.Stats(profiler, stream=output)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(settings.profile_top_functions)
+            output.write("\nSampled stacks, all threads (folded):\n")
+            output.write(stacks)
+            request_profiles.add(profile_id, output.getvalue())
+
+
+class AllocationTracker:
+    def __init__(self) -> None:
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    def start(self, frames: int = 10) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._previous = None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    def snapshot(self, limit: int = 20) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        top = [self._stat_to_dict(stat) for stat in snapshot.statistics("lineno")[:limit]]
+        growth = []
+        if self._previous is not None:
+            growth = [self._stat_to_dict(stat) for stat in snapshot.compare_to(self._previous, "lineno")[:limit]]
+        self._previous = snapshot
+        return {"current_bytes": current, "peak_bytes": peak, "top": top, "growth": growth}
+
+    @staticmethod
+    def _stat_to_dict(stat: Any) -> Dict[str, Any]:
+        frame = stat.traceback[0]
+        payload = {
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            payload["size_diff_bytes"] = stat.size_diff
+            payload["count_diff"] = stat.count_diff
+        return payload
+
+
+allocation_tracker = AllocationTracker()
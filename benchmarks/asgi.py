@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from starlette.types import ASGIApp, Message
+
+
+class InProcessClient:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": parts.path,
+            "raw_path": parts.path.encode(),
+            "root_path": "",
+            "query_string": parts.query.encode(),
+            "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+            "server": ("bench", 80),
+            "client": ("bench", 0),
+        }
+        messages: List[Message] = []
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+        start = next(message for message in messages if message["type"] == "http.response.start")
+        body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+        response_headers = {key.decode(): value.decode() for key, value in start.get("headers", [])}
+        return start["status"], response_headers, body
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        return await self.request("GET", url, headers=headers)
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from app.analytics.aggregator import AnalyticsAggregator
+from app.db import InMemoryPriceRepository, RepositoryBundle
+from app.ingestion.backfill import BackfillCheckpoints, HistoryBackfiller
+from app.ingestion.collector import EventCollector
+from app.models import Event
+from benchmarks.asgi import InProcessClient
+from benchmarks.stubs import BASE_TIME, StubClobClient, StubGammaClient, synthetic_markets, synthetic_ticks
+
+DEFAULT_SIZES = (10**3, 10**4, 10**5, 10**6)
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+Results = Dict[str, Dict[str, Any]]
+
+
+def _measure(func: Callable[[], Any], repeat: int, min_seconds: float = 0.05) -> float:
+    # like timeit: fast calls are looped until a sample is long enough to time
+    # reliably, and the best sample is kept since noise only ever adds time
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+        loops *= 10
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+    return min(timings)
+
+
+def _record(results: Results, name: str, value: float, unit: str, higher_is_better: bool = False) -> None:
+    results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def bench_ingest(results: Results, count: int, repeat: int) -> None:
+    ticks = synthetic_ticks("m", count)
+    for compress in (False, True):
+        def ingest() -> None:
+            repository = InMemoryPriceRepository(compress=compress)
+            repository.set_window("m", (None, None))
+            for tick in ticks:
+                repository.add(tick)
+
+        seconds = _measure(ingest, repeat)
+        label = "compressed" if compress else "raw"
+        _record(results, f"ingest.{label}.ticks_per_second", count / seconds, "ticks/s", higher_is_better=True)
+
+
+def bench_window_queries(results: Results, sizes: List[int], repeat: int) -> None:
+    for size in sizes:
+        repositories = RepositoryBundle()
+        repositories.prices.compress = False
+        repositories.prices.add_many(synthetic_ticks("m", size))
+        start = BASE_TIME + timedelta(seconds=size // 4)
+        end = BASE_TIME + timedelta(seconds=3 * size // 4)
+        seconds = _measure(lambda: list(repositories.list_prices_in_window("m", start, end)), repeat)
+        _record(results, f"window_query.{size}.seconds", seconds, "s")
+        seconds = _measure(lambda: repositories.price_window("m", start, end), repeat)
+        _record(results, f"window_arrays.{size}.seconds", seconds, "s")
+
+
+def _analytics_fixture(points: int, compress: bool = False) -> RepositoryBundle:
+    repositories = RepositoryBundle()
+    repositories.prices.compress = compress
+    repositories.events.upsert(
+        Event(
+            event_id="e",
+            market_id="m",
+            token_id="token",
+            title="benchmark",
+            category="crypto/15M",
+            start_time=BASE_TIME,
+            end_time=BASE_TIME + timedelta(seconds=points),
+            status="active",
+        )
+    )
+    repositories.prices.add_many(synthetic_ticks("m", points))
+    return repositories
+
+
+def bench_analytics(results: Results, points: int, repeat: int) -> None:
+    repositories = _analytics_fixture(points)
+    aggregator = AnalyticsAggregator(repositories)
+    seconds = _measure(lambda: aggregator.update_event_analytics("e"), repeat)
+    _record(results, f"analytics.update.{points}.seconds", seconds, "s")
+
+
+def bench_collect(results: Results, markets: int, repeat: int) -> None:
+    payload = synthetic_markets(markets)
+    collector = EventCollector(RepositoryBundle(), gamma=StubGammaClient(payload))
+    seconds = _measure(lambda: collector.collect(category="crypto/15M"), repeat)
+    _record(results, f"collect.{markets}.seconds", seconds, "s")
+
+
+def bench_backfill(results: Results, events: int, repeat: int) -> None:
+    collected = EventCollector(RepositoryBundle(), gamma=StubGammaClient(synthetic_markets(events))).collect(
+        category="crypto/15M"
+    )
+
+    def backfill() -> None:
+        repositories = RepositoryBundle()
+        repositories.events.upsert_many(collected)
+        backfiller = HistoryBackfiller(
+            repositories,
+            clob=StubClobClient(),
+            checkpoints=BackfillCheckpoints(),
+            requests_per_second=0,
+        )
+        result = backfiller.backfill(collected)
+        if result.failed or result.events != len(collected):
+            raise RuntimeError(f"backfill loaded {result.events}/{len(collected)} events")
+
+    seconds = _measure(backfill, repeat)
+    _record(results, f"backfill.{events}.seconds", seconds, "s")
+
+
+def bench_api(results: Results, points: int, requests: int, concurrency: int) -> None:
+    from app.api import main
+
+    main.services.provide("clob_client", StubClobClient())
+    main.services.provide("gamma_client", StubGammaClient(synthetic_markets(16)))
+    repositories = main.services.repositories
+    repositories.events.upsert(
+        Event(
+            event_id="e",
+            market_id="m",
+            token_id="token",
+            title="benchmark",
+            category="crypto/15M",
+            start_time=BASE_TIME,
+            end_time=BASE_TIME + timedelta(seconds=points),
+            status="active",
+        )
+    )
+    repositories.prices.add_many(synthetic_ticks("m", points))
+    client = InProcessClient(main.app)
+    routes = {
+        "price_history": "/events/price-history?event_id=m",
+        "analytics": "/events/e/analytics",
+    }
+
+    async def run() -> None:
+        for name, url in routes.items():
+            latencies: List[float] = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                status, _, _ = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError(f"{url} returned {status}")
+            latencies.sort()
+            _record(results, f"api.{name}.p50_seconds", latencies[len(latencies) // 2], "s")
+            _record(results, f"api.{name}.p95_seconds", latencies[int(len(latencies) * 0.95) - 1], "s")
+            start = time.perf_counter()
+            for _ in range(max(requests // concurrency, 1)):
+                await asyncio.gather(*(client.get(url) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            total = max(requests // concurrency, 1) * concurrency
+            _record(results, f"api.{name}.requests_per_second", total / elapsed, "req/s", higher_is_better=True)
+
+    asyncio.run(run())
+
+
+STARTUP_SCRIPT = """
+import asyncio, time
+start = time.perf_counter()
+from app.api.main import app
+from benchmarks.asgi import InProcessClient
+imported = time.perf_counter()
+status, _, _ = asyncio.run(InProcessClient(app).get("/"))
+assert status == 200, status
+print(imported - start, time.perf_counter() - start)
+"""
+
+
+def bench_startup(results: Results, repeat: int) -> None:
+    imports: List[float] = []
+    first_responses: List[float] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        imports.append(float(output[0]))
+        first_responses.append(float(output[1]))
+    _record(results, "startup.import_seconds", statistics.median(imports), "s")
+    _record(results, "startup.first_response_seconds", statistics.median(first_responses), "s")
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            continue
+        ratio = current["value"] / previous["value"]
+        if current["higher_is_better"]:
+            regressed = ratio < 1 - tolerance
+        else:
+            regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(f"{name}: {previous['value']:.6g} -> {current['value']:.6g} {current['unit']}")
+    return regressions
+
+
+def run_all(args: argparse.Namespace) -> Results:
+    results: Results = {}
+    bench_startup(results, args.repeat)
+    bench_ingest(results, args.ingest_ticks, args.repeat)
+    bench_window_queries(results, args.sizes, args.repeat)
+    bench_analytics(results, args.analytics_points, args.repeat)
+    bench_collect(results, args.markets, args.repeat)
+    bench_backfill(results, args.backfill_events, args.repeat)
+    bench_api(results, args.api_points, args.requests, args.concurrency)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--ingest-ticks", type=int, default=10**5)
+    parser.add_argument("--analytics-points", type=int, default=10**5)
+    parser.add_argument("--markets", type=int, default=10**4)
+    parser.add_argument("--backfill-events", type=int, default=10**3)
+    parser.add_argument("--api-points", type=int, default=10**4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_all(args)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+        return 0
+    try:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+    except FileNotFoundError:
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.clients.clob import ClobClient
+from app.clients.gamma import GammaClient
+from app.models import PricePoint, to_epoch_us
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+BASE_TS = to_epoch_us(BASE_TIME)
+
+
+def synthetic_markets(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    markets = []
+    for index in range(count):
+        asset = ("btc", "eth", "sol", "xrp")[index % 4]
+        start = BASE_TIME + timedelta(minutes=15 * (index // 4))
+        markets.append(
+            {
+                "id": str(100000 + index),
+                "slug": f"{asset}-updown-15m-{int(start.timestamp())}",
+                "question": f"{asset.upper()} Up or Down - window {index}",
+                "category": "Crypto/15M",
+                "start_date": start.isoformat().replace("+00:00", "Z"),
+                "end_date": (start + timedelta(minutes=15)).isoformat().replace("+00:00", "Z"),
+                "clobTokenIds": [str(rng.getrandbits(64)), str(rng.getrandbits(64))],
+                "outcomePrices": ["0.5", "0.5"],
+                "resolved": index % 3 == 0,
+                "resolution": "Up" if index % 6 == 0 else None,
+            }
+        )
+    return markets
+
+
+def synthetic_ticks(market_id: str, count: int, seed: int = 11, flat_ratio: float = 0.8) -> List[PricePoint]:
+    rng = random.Random(seed)
+    price = 0.5
+    points = []
+    for index in range(count):
+        if rng.random() > flat_ratio:
+            price = round(min(max(price + rng.uniform(-0.05, 0.05), 0.01), 0.99), 3)
+        points.append(PricePoint(market_id, "token", BASE_TS + index * 1_000_000, price))
+    return points
+
+
+class StubGammaClient(GammaClient):
+    def __init__(self, markets: List[Dict[str, Any]]) -> None:
+        super().__init__(base_url="http://stub.invalid")
+        self.markets = markets
+
+    def fetch_markets(self, params: Optional[Dict[str, Any]] = None) -> Iterable[Dict[str, Any]]:
+        return self.markets
+
+    def fetch_events(self, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return []
+
+    def fetch_tags(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return [{"id": "21", "label": "Crypto", "slug": "crypto"}]
+
+
+class StubClobClient(ClobClient):
+    def __init__(self) -> None:
+        super().__init__(base_url="http://stub.invalid")
+
+    def fetch_price(self, token_id: str, side: str = "buy") -> Dict[str, Any]:
+        return {"price": "0.5"}
+
+    def fetch_prices_history(
+        self,
+        token_id: str,
+        start_ts: int,
+        end_ts: int,
+        fidelity: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        step = 60 * (fidelity or 1)
+        return [{"t": ts, "p": 0.5} for ts in range(start_ts, end_ts, step)]